@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+import email.message
+import json
+import math
 import os
-from typing import List, Optional, Literal
+import warnings
+
+# One OpenMP thread per process: we score single rows and scale out with uvicorn
+# workers, so letting every worker's LightGBM claim all cores only oversubscribes.
+# Must be set before lightgbm (and its OpenMP runtime) is imported.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, List, Optional, Literal, Tuple
 
 import joblib
 import numpy as np
+import orjson
 import pandas as pd
-from fastapi import FastAPI, HTTPException, Query
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, ValidationError
 
 # --------------------------------------------------------------------------------------
 # Feature engineering helpers (force-UTC inside ensure_time_and_sort in your file)
@@ -15,8 +30,10 @@ from pydantic import BaseModel, Field
 try:
     from preprocessing.feature_engineering import (
         FINAL_FEATURES,
-        ensure_time_and_sort,
-        build_features_from_ohlcv,
+        build_feature_matrix_from_arrays,
+        last_feature_row,
+        months_from_epoch,
+        to_utc_datetime,
     )
 except Exception as e:
     raise RuntimeError(f"Failed to import preprocessing.feature_engineering: {e}")
@@ -26,14 +43,18 @@ except Exception as e:
 # Keep only ONE fetcher module in your repo. We import this one explicitly.
 # --------------------------------------------------------------------------------------
 try:
-    from fetch.kraken_ohlc_solusd import get_recent_candles as fetch_candles  # type: ignore
+    from fetch.kraken_ohlc_solusd import aclose as close_fetcher  # type: ignore
+    from fetch.kraken_ohlc_solusd import get_recent_candles_async as fetch_candles_async  # type: ignore
 except Exception as e:
-    fetch_candles = None  # we'll error nicely in the endpoint
+    close_fetcher = None
+    fetch_candles_async = None  # we'll error nicely in the endpoint
 
 # --------------------------------------------------------------------------------------
 # Config
 # --------------------------------------------------------------------------------------
 MODEL_PATH = os.getenv("MODEL_PATH", "models/lgbm_final_ma_copy.joblib")
+MODEL_TEXT_PATH = os.getenv("MODEL_TEXT_PATH", "models/lgbm_final.txt")  # built by scripts/export_model.py
+TL2CGEN_LIB_PATH = os.getenv("TL2CGEN_LIB_PATH", "models/lgbm.so")  # built by scripts/compile_model.py
 MODEL_TARGET_MODE: Literal["level", "delta", "logdiff"] = os.getenv("MODEL_TARGET_MODE", "level").lower()  # how the model was trained
 
 # --------------------------------------------------------------------------------------
@@ -48,26 +69,54 @@ except ModuleNotFoundError as e:
         "or if using pip + Homebrew:\n  pip install lightgbm && brew install libomp\n"
     ) from e
 
+# Prefer LightGBM's native text dump (no unpickling per worker); else the joblib pickle.
+# A dump older than the joblib is from a previous model: ignore it rather than serve it.
+MODEL_SOURCE = MODEL_TEXT_PATH if os.path.exists(MODEL_TEXT_PATH) else MODEL_PATH
+if MODEL_SOURCE == MODEL_TEXT_PATH and os.path.exists(MODEL_PATH) \
+        and os.path.getmtime(MODEL_TEXT_PATH) < os.path.getmtime(MODEL_PATH):
+    warnings.warn(
+        f"{MODEL_TEXT_PATH} is older than {MODEL_PATH} (stale export?); loading the joblib. "
+        "Re-run scripts/export_model.py."
+    )
+    MODEL_SOURCE = MODEL_PATH
 try:
-    model = joblib.load(MODEL_PATH)
+    if MODEL_SOURCE == MODEL_TEXT_PATH:
+        model = lgb.Booster(model_file=MODEL_TEXT_PATH)
+    else:
+        model = joblib.load(MODEL_PATH)
 except OSError as e:
     raise RuntimeError(
-        f"Failed to load model from {MODEL_PATH}: {e}\n"
+        f"Failed to load model from {MODEL_SOURCE}: {e}\n"
         "If error mentions libomp.dylib on macOS, install OpenMP runtime:\n"
         "  conda install -c conda-forge llvm-openmp\n  # or: brew install libomp"
     )
 except Exception as e:
-    raise RuntimeError(f"Failed to load model from {MODEL_PATH}: {e}")
+    raise RuntimeError(f"Failed to load model from {MODEL_SOURCE}: {e}")
+
+# Predict through the underlying Booster on plain float64 arrays: skips the
+# sklearn wrapper's DataFrame/feature-name handling on every request.
+# Scoring is one row at a time, so predict with num_threads=1 (no OpenMP pool).
+booster = getattr(model, "booster_", model)
+BEST_ITERATION = booster.best_iteration  # <= 0 means all trees (same as model.predict)
+
+# Optional: tl2cgen-compiled model (direct native call, no per-predict overhead)
+try:
+    import tl2cgen  # type: ignore
+    predictor = tl2cgen.Predictor(TL2CGEN_LIB_PATH, nthread=1) if os.path.exists(TL2CGEN_LIB_PATH) else None
+except Exception:
+    tl2cgen = None
+    predictor = None
 
 # --------------------------------------------------------------------------------------
 # Schemas
 # --------------------------------------------------------------------------------------
 class Candle(BaseModel):
     timeOpen: str = Field(..., description="ISO timestamp of the bar open time (e.g., 2025-09-30T00:00:00Z)")
-    open: float
-    high: float
-    low: float
-    close: float
+    # Non-finite prices would poison the EMAs/lags; reject them here (422)
+    open: float = Field(..., allow_inf_nan=False)
+    high: float = Field(..., allow_inf_nan=False)
+    low: float = Field(..., allow_inf_nan=False)
+    close: float = Field(..., allow_inf_nan=False)
     volume: Optional[float] = None
 
 class PredictRequest(BaseModel):
@@ -76,6 +125,22 @@ class PredictRequest(BaseModel):
         None, description="Override the server default. 'level' predicts next-day high directly; 'delta' predicts add-on to last high; 'logdiff' predicts log(h_{t+1})-log(h_t)."
     )
 
+def _openapi_body(model: type[BaseModel]) -> dict:
+    """requestBody for endpoints that parse the body themselves (keeps /docs accurate)."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def inline(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return inline(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: inline(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [inline(v) for v in node]
+        return node
+
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": inline(schema)}}}}
+
 class PredictResponse(BaseModel):
     predicted_high_next_day: float
     target_mode: Literal["level", "delta", "logdiff"]
@@ -90,7 +155,20 @@ class PredictTokenResponse(PredictResponse):
 # --------------------------------------------------------------------------------------
 # App
 # --------------------------------------------------------------------------------------
-app = FastAPI(title="SOL Next-Day High Predictor", version="1.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release the fetcher's pooled keep-alive connections on shutdown
+    if close_fetcher is not None:
+        await close_fetcher()
+
+
+app = FastAPI(
+    title="SOL Next-Day High Predictor",
+    version="1.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 @app.get("/")
 def root():
@@ -116,23 +194,110 @@ def root():
 def health():
     return {"status": "ok"}
 
+def _model_repr() -> str:
+    # A bare Booster only reprs as "<lightgbm.basic.Booster object at 0x...>"
+    if model is booster:
+        return f"lightgbm.Booster(num_trees={booster.num_trees()}, best_iteration={BEST_ITERATION})"
+    return str(model)[:400]
+
 @app.get("/model/info")
 def model_info():
     return {
-        "model_path": MODEL_PATH,
+        "model_path": MODEL_SOURCE,
         "target_mode": MODEL_TARGET_MODE,
         "final_features": FINAL_FEATURES,
-        "model_repr": str(model)[:400],
+        "model_repr": _model_repr(),
+        "compiled_predictor": TL2CGEN_LIB_PATH if predictor is not None else None,
     }
 
 # --------------------------------------------------------------------------------------
 # Helpers
 # --------------------------------------------------------------------------------------
 
-def _prepare_features(df_in: pd.DataFrame) -> pd.DataFrame:
-    df_feat = build_features_from_ohlcv(df_in)
-    df_feat = df_feat.dropna(subset=FINAL_FEATURES).reset_index(drop=True)
-    return df_feat[FINAL_FEATURES]
+def _prepare_features(
+    o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray, v: np.ndarray, month: np.ndarray  # noqa: E741
+) -> np.ndarray:
+    """Feature rows (FINAL_FEATURES order) without NaNs, oldest first.
+    Inputs are ascending in time. Normally only the newest row is computed.
+    """
+    x_last = last_feature_row(o, h, l, c, v, month[-1]) if len(c) else None
+    if x_last is not None and not np.isnan(x_last).any():
+        return x_last.reshape(1, -1)
+    # Newest row incomplete (e.g. missing volume): fall back to the previous row,
+    # but never to older ones -- that would silently predict from stale data
+    X = build_feature_matrix_from_arrays(o, h, l, c, v, month)
+    complete = ~np.isnan(X).any(axis=1)
+    if complete.any() and not complete[-2:].any():
+        raise HTTPException(
+            status_code=400,
+            detail="The two newest candles have missing values (e.g. volume); cannot build features for them.",
+        )
+    return X[complete]
+
+
+def _prepare_features_from_candles(candles: dict) -> np.ndarray:
+    """_prepare_features for the fetcher's ascending column arrays."""
+    return _prepare_features(
+        candles["open"], candles["high"], candles["low"], candles["close"], candles["volume"],
+        months_from_epoch(candles["timeOpen"]),
+    )
+
+
+def _predict_raw(x_tail: np.ndarray) -> float:
+    """Raw model output for a single (1, n_features) float64 row."""
+    if predictor is not None:
+        return float(predictor.predict(tl2cgen.DMatrix(x_tail)).ravel()[0])
+    return float(booster.predict(x_tail, num_iteration=BEST_ITERATION, num_threads=1)[0])
+
+
+@lru_cache(maxsize=1024)
+def _cached_predict(key: Tuple[float, ...]) -> float:
+    """_predict_raw memoised on the feature row rounded to 6 decimals.
+    Daily candles change once a day, so polling clients mostly hit the cache.
+    """
+    return _predict_raw(np.asarray(key, dtype=np.float64).reshape(1, -1))
+
+
+def _probe_rows(n: int = 64) -> np.ndarray:
+    """Deterministic feature rows spanning plausible price/volume/month ranges."""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0.0, 500.0, size=(n, len(FINAL_FEATURES)))
+    for name in ("volume", "volume_sma21"):
+        X[:, FINAL_FEATURES.index(name)] = rng.uniform(0.0, 1e7, size=n)
+    X[:, FINAL_FEATURES.index("month")] = rng.integers(1, 13, size=n)
+    X[0] = 0.0
+    return X
+
+
+# Warm-up: the first predict pays one-off setup (LightGBM predictor/buffers,
+# tl2cgen library load); do it at startup and fail fast on a feature-count mismatch.
+_PROBE = _probe_rows()
+try:
+    _probe_expected = booster.predict(_PROBE, num_iteration=BEST_ITERATION, num_threads=1)
+except Exception as e:
+    raise RuntimeError(f"Model warm-up prediction failed ({MODEL_SOURCE}): {e}")
+
+# The compiled library must reproduce the loaded model; a stale build left over
+# from a previous model would otherwise silently serve old predictions.
+if predictor is not None:
+    try:
+        _probe_compiled = predictor.predict(tl2cgen.DMatrix(_PROBE)).reshape(len(_PROBE), -1)[:, 0]
+        _compiled_ok = np.allclose(_probe_compiled, _probe_expected, rtol=1e-6, atol=1e-6)
+    except Exception:
+        _compiled_ok = False
+    if not _compiled_ok:
+        warnings.warn(
+            f"{TL2CGEN_LIB_PATH} does not reproduce {MODEL_SOURCE} (stale build?); "
+            "serving predictions from the Booster. Re-run scripts/compile_model.py."
+        )
+        predictor = None
+
+_predict_raw(_PROBE[:1])
+
+
+def _feature_tail(row: np.ndarray) -> dict:
+    """Feature row as {name: value} for the response; NaN -> None."""
+    return {k: (None if math.isnan(v) else v) for k, v in zip(FINAL_FEATURES, row.tolist())}
 
 
 def _invert_prediction(yhat_raw: float, last_high: Optional[float], mode: Literal["level", "delta", "logdiff"]) -> float:
@@ -153,32 +318,93 @@ def _to_utc(s: pd.Series) -> pd.Series:
     # if tz-naive → localize to UTC; if tz-aware → convert to UTC
     return s.dt.tz_localize("UTC") if s.dt.tz is None else s.dt.tz_convert("UTC")
 
+def _is_json_content_type(value: Optional[str]) -> bool:
+    """FastAPI's rule: no content-type, application/json or application/*+json."""
+    if not value:
+        return True
+    message = email.message.Message()
+    message["content-type"] = value
+    subtype = message.get_content_subtype()
+    return message.get_content_maintype() == "application" and (subtype == "json" or subtype.endswith("+json"))
+
+
+async def _validate_body(request: Request, model: type[BaseModel]) -> Any:
+    """FastAPI's request-body handling (content-type check, 422/400 payloads) with
+    orjson decoding and a single pydantic-core validation."""
+    body_bytes = await request.body()
+    body: Any = None
+    if body_bytes:
+        body = body_bytes  # non-JSON content-type: validated as-is, like FastAPI
+        if _is_json_content_type(request.headers.get("content-type")):
+            try:
+                body = orjson.loads(body_bytes)
+            except orjson.JSONDecodeError:
+                # orjson is strict: stdlib json also takes NaN/Infinity literals and
+                # reports the error position/message FastAPI would
+                try:
+                    body = json.loads(body_bytes)
+                except json.JSONDecodeError as e:
+                    raise RequestValidationError(
+                        [{"type": "json_invalid", "loc": ("body", e.pos), "msg": "JSON decode error",
+                          "input": {}, "ctx": {"error": e.msg}}],
+                        body=e.doc,
+                    )
+                except Exception:
+                    raise HTTPException(status_code=400, detail="There was an error parsing the body")
+    if body is None:  # empty body or JSON null
+        raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+    try:
+        return model.model_validate(body, from_attributes=True)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)], body=body
+        )
+
 # --------------------------------------------------------------------------------------
 # POST /predict  (user supplies candles)
 # --------------------------------------------------------------------------------------
-@app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest):
+@app.post("/predict", response_model=PredictResponse, openapi_extra=_openapi_body(PredictRequest))
+async def predict(request: Request):
+    # Parse with orjson and validate once with pydantic-core; FastAPI's own body
+    # handling would decode with stdlib json first.
+    req = await _validate_body(request, PredictRequest)
+
     mode = (req.target_mode or MODEL_TARGET_MODE).lower()  # type: ignore
 
     if not req.candles or len(req.candles) < 21:
         raise HTTPException(status_code=400, detail="Please provide at least 21 recent candles for features like volume_sma21.")
 
-    df = pd.DataFrame([c.dict() for c in req.candles])
-    missing_cols = {"timeOpen", "open", "high", "low", "close"} - set(df.columns)
-    if missing_cols:
-        raise HTTPException(status_code=400, detail=f"Missing required columns: {sorted(missing_cols)}")
-
-    # Force UTC-awareness and sort
-    df = ensure_time_and_sort(df, time_col="timeOpen")  # your util should already do utc=True
+    # Column arrays straight from the validated models (schema guarantees the fields)
+    n = len(req.candles)
+    cols = {
+        f: np.fromiter((getattr(c, f) for c in req.candles), dtype=np.float64, count=n)
+        for f in ("open", "high", "low", "close")
+    }
+    cols["volume"] = np.fromiter(
+        (c.volume if c.volume is not None else np.nan for c in req.candles), dtype=np.float64, count=n
+    )
 
-    last_high = float(df["high"].iloc[-1])
-    X = _prepare_features(df)
-    if X.empty:
+    # Force UTC-awareness and sort (ISO8601 fast path, as in ensure_time_and_sort)
+    try:
+        ts = to_utc_datetime([c.timeOpen for c in req.candles])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid timeOpen. Use ISO date or datetime, e.g., 2025-09-30 or 2025-09-30T00:00:00Z.")
+    if not ts.is_monotonic_increasing:
+        order = np.argsort(ts.asi8, kind="stable")
+        ts = ts[order]
+        cols = {f: a[order] for f, a in cols.items()}
+
+    last_high = float(cols["high"][-1])
+    X = _prepare_features(
+        cols["open"], cols["high"], cols["low"], cols["close"], cols["volume"],
+        ts.month.to_numpy(dtype=np.float64),
+    )
+    if X.shape[0] == 0:
         raise HTTPException(status_code=400, detail="Not enough history after feature engineering (NaNs after lags/SMAs).")
 
-    x_tail = X.iloc[[-1]]
+    x_tail = X[-1:].reshape(1, -1)
     try:
-        yhat_raw = float(model.predict(x_tail)[0])
+        yhat_raw = _cached_predict(tuple(np.round(x_tail[0], 6).tolist()))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Model prediction failed: {e}")
 
@@ -189,41 +415,39 @@ def predict(req: PredictRequest):
         target_mode=mode,  # type: ignore
         last_known_high=last_high,
         features_used=FINAL_FEATURES,
-        feature_vector_tail={k: (None if pd.isna(v) else float(v)) for k, v in x_tail.iloc[0].to_dict().items()},
+        feature_vector_tail=_feature_tail(x_tail[0]),
     )
 
 # --------------------------------------------------------------------------------------
 # GET /predict/sol  (fetch candles for SOL* and predict)
 # --------------------------------------------------------------------------------------
 @app.get("/predict/sol", response_model=PredictTokenResponse)
-def predict_sol(
+async def predict_sol(
     n: int = Query(64, ge=21, le=1000, description="History window size (must be >=21)"),
     target_mode: Optional[Literal["level", "delta", "logdiff"]] = Query(None),
 ):
-    if fetch_candles is None:
-        raise HTTPException(status_code=501, detail="No fetcher available. Ensure fetch/kraken_ohlc_solusd.py exists with get_recent_candles().")
+    if fetch_candles_async is None:
+        raise HTTPException(status_code=501, detail="No fetcher available. Ensure fetch/kraken_ohlc_solusd.py exists with get_recent_candles_async().")
 
     mode = (target_mode or MODEL_TARGET_MODE).lower()
 
     try:
-        rows = fetch_candles("SOLUSD", n)
+        candles = await fetch_candles_async("SOLUSD", n)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Fetcher failed: {e}")
 
-    df = pd.DataFrame(rows)
-    df = ensure_time_and_sort(df, time_col="timeOpen")
-
-    if len(df) < 21:
+    rows_used = len(candles["timeOpen"])
+    if rows_used < 21:
         raise HTTPException(status_code=400, detail="Insufficient history (need >= 21 rows).")
 
-    last_high = float(df["high"].iloc[-1])
-    X = _prepare_features(df)
-    if X.empty:
+    last_high = float(candles["high"][-1])
+    X = _prepare_features_from_candles(candles)
+    if X.shape[0] == 0:
         raise HTTPException(status_code=400, detail="Not enough history after feature engineering (NaNs after lags/SMAs).")
 
-    x_tail = X.iloc[[-1]]
+    x_tail = X[-1:].reshape(1, -1)
     try:
-        yhat_raw = float(model.predict(x_tail)[0])
+        yhat_raw = _cached_predict(tuple(np.round(x_tail[0], 6).tolist()))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Model prediction failed: {e}")
 
@@ -231,59 +455,58 @@ def predict_sol(
 
     return PredictTokenResponse(
         token="SOLUSD",
-        history_rows_used=len(df),
+        history_rows_used=rows_used,
         predicted_high_next_day=yhat,
         target_mode=mode,  # type: ignore
         last_known_high=last_high,
         features_used=FINAL_FEATURES,
-        feature_vector_tail={k: (None if pd.isna(v) else float(v)) for k, v in x_tail.iloc[0].to_dict().items()},
+        feature_vector_tail=_feature_tail(x_tail[0]),
     )
 
 # --------------------------------------------------------------------------------------
 # GET /predict/sol/at  (anchor by date)
 # --------------------------------------------------------------------------------------
 @app.get("/predict/sol/at", response_model=PredictTokenResponse)
-def predict_sol_at(
+async def predict_sol_at(
     date: str = Query(..., description="Anchor date/time in ISO format; we predict the next day from the last candle at/before this time."),
     n: int = Query(256, ge=21, le=2000, description="History window size to fetch."),
     target_mode: Optional[Literal["level", "delta", "logdiff"]] = Query(None),
 ):
-    if fetch_candles is None:
-        raise HTTPException(status_code=501, detail="No fetcher available. Ensure fetch/kraken_ohlc_solusd.py exists with get_recent_candles().")
+    if fetch_candles_async is None:
+        raise HTTPException(status_code=501, detail="No fetcher available. Ensure fetch/kraken_ohlc_solusd.py exists with get_recent_candles_async().")
 
     mode = (target_mode or MODEL_TARGET_MODE).lower()
 
     try:
-        rows = fetch_candles("SOLUSD", n)
+        candles = await fetch_candles_async("SOLUSD", n)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Fetcher failed: {e}")
 
-    df = pd.DataFrame(rows)
-    df = ensure_time_and_sort(df, time_col="timeOpen")
-
-    # Cut to anchor — make *both* sides UTC-aware to avoid tz-naive/aware mismatch
+    # Cut to anchor — parse as UTC; candle times are UTC unix seconds
     try:
         anchor = pd.to_datetime(date, utc=True)
     except Exception:
+        anchor = pd.NaT
+    if pd.isna(anchor):  # also "" and "NaT", which parse to NaT
         raise HTTPException(status_code=400, detail="Invalid date. Use ISO date or datetime, e.g., 2025-09-30 or 2025-09-30T00:00:00Z.")
 
-    ts = pd.to_datetime(df["timeOpen"], utc=True)
-    mask = ts <= anchor
-    if not bool(mask.any()):
+    # Candles are ascending, so "at or before anchor" is a prefix
+    rows_used = int(np.searchsorted(candles["timeOpen"], anchor.timestamp(), side="right"))
+    if rows_used == 0:
         raise HTTPException(status_code=404, detail="No candles at or before the requested date.")
 
-    df_cut = df.loc[mask].copy()
-    if len(df_cut) < 21:
+    candles_cut = {k: v[:rows_used] for k, v in candles.items()}
+    if rows_used < 21:
         raise HTTPException(status_code=400, detail="Insufficient history before the requested date (need >= 21 rows).")
 
-    last_high = float(df_cut["high"].iloc[-1])
-    X = _prepare_features(df_cut)
-    if X.empty:
+    last_high = float(candles_cut["high"][-1])
+    X = _prepare_features_from_candles(candles_cut)
+    if X.shape[0] == 0:
         raise HTTPException(status_code=400, detail="Not enough history after feature engineering (NaNs after lags/SMAs).")
 
-    x_tail = X.iloc[[-1]]
+    x_tail = X[-1:].reshape(1, -1)
     try:
-        yhat_raw = float(model.predict(x_tail)[0])
+        yhat_raw = _cached_predict(tuple(np.round(x_tail[0], 6).tolist()))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Model prediction failed: {e}")
 
@@ -291,10 +514,10 @@ def predict_sol_at(
 
     return PredictTokenResponse(
         token="SOLUSD",
-        history_rows_used=len(df_cut),
+        history_rows_used=rows_used,
         predicted_high_next_day=yhat,
         target_mode=mode,  # type: ignore
         last_known_high=last_high,
         features_used=FINAL_FEATURES,
-        feature_vector_tail={k: (None if pd.isna(v) else float(v)) for k, v in x_tail.iloc[0].to_dict().items()},
+        feature_vector_tail=_feature_tail(x_tail[0]),
     )
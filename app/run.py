@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import os
+
+import uvicorn
+
+# --------------------------------------------------------------------------------------
+# Production launcher: uvloop event loop + httptools HTTP parser (both ship with
+# `uvicorn[standard]`), pre-forked workers.
+#   python -m app.run
+# Env: PORT (default 8000), WEB_CONCURRENCY (workers, default: one per usable core),
+#      LOG_LEVEL (default warning)
+# --------------------------------------------------------------------------------------
+
+
+def default_workers() -> int:
+    """One single-threaded worker per core this process may run on (honours
+    taskset / docker --cpuset-cpus)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY") or default_workers()),
+        log_level=os.getenv("LOG_LEVEL", "warning"),
+    )
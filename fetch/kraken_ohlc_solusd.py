@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from typing import List, Dict, Optional
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timezone
+import time
+import httpx
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 # -----------------------------------------------------------------------------
 # Kraken OHLC fetcher (public endpoint, no auth required)
 # Implements the signature expected by app.main:
-#   get_recent_candles(token: str, n: int, interval: int = 1440) -> List[dict]
-# Returns list of dicts with keys: timeOpen, open, high, low, close, volume
+#   get_recent_candles(token: str, n: int, interval: int = 1440) -> Dict[str, np.ndarray]
+#   async get_recent_candles_async(...) -> same, for async endpoints
+#   async aclose() -> closes the shared async client on shutdown
+# Returns column arrays (ascending by time) with keys:
+#   timeOpen (int64 unix seconds, UTC), open, high, low, close, volume (float64)
 # -----------------------------------------------------------------------------
 
 _PAIR_ALIASES = {
@@ -19,62 +27,23 @@ _PAIR_ALIASES = {
 
 
 
-# Add near the top
 _ALLOWED_INTERVALS = {1, 5, 15, 30, 60, 240, 1440, 10080}  # Kraken-supported mins
+_OHLC_URL = "https://api.kraken.com/0/public/OHLC"
 
-def get_recent_candles(token: str, n: int, interval: int = 1440) -> List[Dict]:
-    if n <= 0:
-        return []
-    if interval not in _ALLOWED_INTERVALS:
-        raise ValueError(f"Unsupported interval={interval}. Choose one of {_ALLOWED_INTERVALS}.")
+# One pooled session / async client for all calls (keep-alive to api.kraken.com)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_ACLIENT: Optional[httpx.AsyncClient] = None  # see _aclient() / aclose()
 
-    pair = _kraken_pair(token)
-    url = "https://api.kraken.com/0/public/OHLC"
-    params = {"pair": pair, "interval": interval}
+_COLUMNS = ("timeOpen", "open", "high", "low", "close", "volume")
 
-    try:
-        r = requests.get(url, params=params, timeout=30)
-        r.raise_for_status()
-        data = r.json()
-    except requests.RequestException as e:
-        raise RuntimeError(f"HTTP error contacting Kraken: {e}") from e
-    except ValueError as e:
-        raise RuntimeError(f"Invalid JSON from Kraken: {e}") from e
+# (pair, interval) -> (monotonic fetch time, parsed columns ascending by time)
+_CACHE: Dict[Tuple[str, int], Tuple[float, Dict[str, np.ndarray]]] = {}
 
-    if not isinstance(data, dict):
-        raise RuntimeError("Unexpected Kraken response type")
-    if data.get("error"):  # Kraken returns [] on success
-        raise RuntimeError(f"Kraken error: {data['error']}")
 
-    res = data.get("result", {})
-    key = next((k for k in res.keys() if k.lower() == pair.lower()), None)
-    if key is None:
-        keys = [k for k in res.keys() if k != "last"]
-        if not keys:
-            raise RuntimeError(f"Unexpected Kraken payload keys: {list(res.keys())}")
-        key = keys[0]
-
-    rows = res.get(key, [])
-    if not rows:
-        raise RuntimeError("No OHLC rows returned from Kraken.")
-
-    out: List[Dict] = []
-    for row in rows[-n:]:
-        try:
-            ts = int(row[0])
-            out.append({
-                "timeOpen": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat().replace("+00:00", "Z"),
-                "open": float(row[1]),
-                "high": float(row[2]),
-                "low": float(row[3]),
-                "close": float(row[4]),
-                "volume": float(row[6]),
-            })
-        except Exception:
-            continue
-
-    out.sort(key=lambda d: d["timeOpen"])
-    return out
+def _cache_ttl(interval: int) -> int:
+    """Seconds a fetched series stays fresh: a quarter of the bar size."""
+    return interval * 60 // 4
 
 
 def _kraken_pair(token: str) -> str:
@@ -89,31 +58,23 @@ def _iso_from_epoch(sec: int) -> str:
     return datetime.fromtimestamp(sec, tz=timezone.utc).isoformat().replace("+00:00", "Z")
 
 
-def get_recent_candles(token: str, n: int, interval: int = 1440) -> List[Dict]: # signature unchanged
-    """Fetch last n OHLC candles for a token pair from Kraken.
+def _tail(candles: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    return {k: v[-n:] for k, v in candles.items()}
 
-    Args:
-        token: market pair like "SOLUSD" (BTC is XBT on Kraken, alias handled).
-        n: number of rows to return (most-recent last).
-        interval: bar size in minutes (5 for 5-min, 60 for hourly, 1440 for daily).
 
-    Returns:
-        List of dicts with fields: timeOpen, open, high, low, close, volume.
-    """
-    if n <= 0:
-        return []
+def _empty_candles() -> Dict[str, np.ndarray]:
+    return {k: np.empty(0, dtype=np.int64 if k == "timeOpen" else np.float64) for k in _COLUMNS}
 
-    pair = _kraken_pair(token)
-    url = "https://api.kraken.com/0/public/OHLC"
-    params = {"pair": pair, "interval": interval}
 
-    try:
-        r = requests.get(url, params=params, timeout=30)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        raise RuntimeError(f"HTTP error contacting Kraken: {e}")
+def _cached_candles(pair: str, interval: int, n: int) -> Optional[Dict[str, np.ndarray]]:
+    cached = _CACHE.get((pair, interval))
+    if cached is not None and time.monotonic() - cached[0] < _cache_ttl(interval):
+        return _tail(cached[1], n)
+    return None
 
+
+def _parse_ohlc(data, pair: str, interval: int) -> Dict[str, np.ndarray]:
+    """Validate a Kraken OHLC payload, parse all rows and cache them."""
     if not isinstance(data, dict):
         raise RuntimeError("Unexpected Kraken response type")
 
@@ -139,25 +100,109 @@ def get_recent_candles(token: str, n: int, interval: int = 1440) -> List[Dict]:
         raise RuntimeError("No OHLC rows returned from Kraken.")
 
     # Each row format: [time, open, high, low, close, vwap, volume, count]
-    out: List[Dict] = []
-    for row in rows[-n:]:
+    # Parse the whole series once into preallocated columns; cache hits only slice it
+    m = len(rows)
+    ts = np.empty(m, dtype=np.int64)
+    o, h, l, c, v = (np.empty(m, dtype=np.float64) for _ in range(5))  # noqa: E741
+    i = 0
+    for row in rows:
         try:
-            ts = int(row[0])
-            out.append({
-                "timeOpen": _iso_from_epoch(ts),
-                "open": float(row[1]),
-                "high": float(row[2]),
-                "low": float(row[3]),
-                "close": float(row[4]),
-                "volume": float(row[6]),
-            })
+            ts[i] = int(row[0])
+            o[i] = float(row[1])
+            h[i] = float(row[2])
+            l[i] = float(row[3])
+            c[i] = float(row[4])
+            v[i] = float(row[6])
         except Exception:
             # skip malformed lines
             continue
+        i += 1
+    candles = dict(zip(_COLUMNS, (a[:i] for a in (ts, o, h, l, c, v))))
+
+    # Ensure ascending by time (Kraken already sends it that way; reorder only if not)
+    if not np.all(np.diff(candles["timeOpen"]) >= 0):
+        order = np.argsort(candles["timeOpen"], kind="stable")
+        candles = {k: a[order] for k, a in candles.items()}
+    # Callers get views of the cached columns: read-only, so nobody can corrupt the cache
+    for a in candles.values():
+        a.flags.writeable = False
+    _CACHE[(pair, interval)] = (time.monotonic(), candles)
+    return candles
+
+
+def _aclient() -> httpx.AsyncClient:
+    """The shared async client; created on first use and again after aclose()."""
+    global _ACLIENT
+    if _ACLIENT is None or _ACLIENT.is_closed:
+        _ACLIENT = httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_keepalive_connections=10))
+    return _ACLIENT
+
+
+def _check_interval(interval: int) -> None:
+    if interval not in _ALLOWED_INTERVALS:
+        raise ValueError(f"Unsupported interval={interval}. Choose one of {_ALLOWED_INTERVALS}.")
+
+
+def get_recent_candles(token: str, n: int, interval: int = 1440) -> Dict[str, np.ndarray]:
+    """Fetch last n OHLC candles for a token pair from Kraken.
+
+    Args:
+        token: market pair like "SOLUSD" (BTC is XBT on Kraken, alias handled).
+        n: number of rows to return (most-recent last).
+        interval: bar size in minutes (5 for 5-min, 60 for hourly, 1440 for daily).
+
+    Returns:
+        Column arrays: timeOpen (int64 unix seconds), open, high, low, close, volume.
+
+    Results are cached per (pair, interval) for interval/4 so repeat calls
+    within the same bar skip the network round-trip.
+    """
+    if n <= 0:
+        return _empty_candles()
+    _check_interval(interval)
+
+    pair = _kraken_pair(token)
+    cached = _cached_candles(pair, interval, n)
+    if cached is not None:
+        return cached
+
+    try:
+        r = _SESSION.get(_OHLC_URL, params={"pair": pair, "interval": interval}, timeout=30)
+        r.raise_for_status()
+        data = orjson.loads(r.content)
+    except Exception as e:
+        raise RuntimeError(f"HTTP error contacting Kraken: {e}")
+
+    return _tail(_parse_ohlc(data, pair, interval), n)
+
+
+async def get_recent_candles_async(token: str, n: int, interval: int = 1440) -> Dict[str, np.ndarray]:
+    """Async variant of get_recent_candles (shared client and cache)."""
+    if n <= 0:
+        return _empty_candles()
+    _check_interval(interval)
+
+    pair = _kraken_pair(token)
+    cached = _cached_candles(pair, interval, n)
+    if cached is not None:
+        return cached
+
+    try:
+        r = await _aclient().get(_OHLC_URL, params={"pair": pair, "interval": interval})
+        r.raise_for_status()
+        data = orjson.loads(r.content)
+    except Exception as e:
+        raise RuntimeError(f"HTTP error contacting Kraken: {e}")
+
+    return _tail(_parse_ohlc(data, pair, interval), n)
+
 
-    # Ensure ascending by time
-    out.sort(key=lambda d: d["timeOpen"]) 
-    return out
+async def aclose() -> None:
+    """Close the shared async client (application shutdown); the next call opens a new one."""
+    global _ACLIENT
+    client, _ACLIENT = _ACLIENT, None
+    if client is not None:
+        await client.aclose()
 
 
 # Backward-compatible demo for quick CLI testing
@@ -167,4 +212,8 @@ if __name__ == "__main__":
     interval = int(sys.argv[2]) if len(sys.argv) > 2 else 5
     n = int(sys.argv[3]) if len(sys.argv) > 3 else 10
     candles = get_recent_candles(pair, n=n, interval=interval)
-    print(_json.dumps(candles, indent=2))
+    rows = [
+        {"timeOpen": _iso_from_epoch(int(ts)), **{k: float(candles[k][i]) for k in _COLUMNS[1:]}}
+        for i, ts in enumerate(candles["timeOpen"])
+    ]
+    print(_json.dumps(rows, indent=2))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import List, Dict
 from datetime import datetime, timezone
+import numpy as np
 import requests
 
 # SOL-only public OHLC fetcher for Kraken
@@ -47,8 +48,10 @@ def get_recent_candles(token: str, n: int, interval: int = 1440) -> List[Dict]:
         raise RuntimeError("No OHLC rows returned from Kraken.")
 
     out: List[Dict] = []
+    times: List[int] = []
     for row in rows[-n:]:
         ts = int(row[0])
+        times.append(ts)
         out.append({
             "timeOpen": _iso(ts),
             "open": float(row[1]),
@@ -58,7 +61,10 @@ def get_recent_candles(token: str, n: int, interval: int = 1440) -> List[Dict]:
             "volume": float(row[6]),
         })
 
-    out.sort(key=lambda d: d["timeOpen"])  # ascending
+    # ascending; Kraken already sends rows in time order, reorder only if not
+    ts_arr = np.fromiter(times, dtype=np.int64, count=len(times))
+    if not np.all(np.diff(ts_arr) >= 0):
+        out = [out[i] for i in np.argsort(ts_arr, kind="stable")]
     return out
 
 
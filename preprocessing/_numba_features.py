@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, types
+
+# -----------------------------------------------------------------------------
+# Fused feature kernel for FINAL_FEATURES (see feature_engineering.py).
+# One pass over the candles: EMA recurrences, sliding-window SMA sums and lag
+# copies are written straight into a preallocated (N, len(FINAL_FEATURES))
+# matrix. Column order MUST match FINAL_FEATURES; the last column (month) is
+# filled by the caller since it comes from the timestamps, not OHLCV.
+#
+# Compiled eagerly (explicit signature) and cached on disk, so the first
+# request does not pay the JIT cost. Inputs are typed read-only so writable and
+# read-only float64 arrays (pandas copy-on-write, np.frombuffer) both match;
+# callers coerce to float64 first (see feature_engineering.py).
+# -----------------------------------------------------------------------------
+
+_EMA3_ALPHA = 2.0 / (3 + 1)
+
+_F8_IN = types.Array(types.float64, 1, "A", readonly=True)
+
+
+@njit(cache=True)
+def _ema3_step(ema, old_wt, x):
+    """One ewm(span=3, adjust=False) step with pandas' NaN rule (ignore_na=False):
+    a NaN keeps the mean and decays its weight; returns (ema, old_wt)."""
+    if ema == ema:
+        old_wt *= 1.0 - _EMA3_ALPHA
+        if x == x:
+            new_wt = 1.0 - old_wt  # pandas' weighting for com == 1 (span 3)
+            ema = (old_wt * ema + new_wt * x) / (old_wt + new_wt)
+            old_wt = 1.0
+    elif x == x:
+        ema = x
+    return ema, old_wt
+
+
+@njit(types.void(_F8_IN, _F8_IN, _F8_IN, _F8_IN, _F8_IN, types.float64[:, :]), cache=True)
+def _build(o, h, l, c, v, out):  # noqa: E741
+    n = c.shape[0]
+    nan = np.nan
+
+    ema_c = nan
+    ema_l = nan
+    wt_c = 1.0
+    wt_l = 1.0
+    # Rolling means skip NaNs (pandas min_periods=1): running sums plus counts
+    sum_o3 = 0.0
+    sum_o7 = 0.0
+    sum_v21 = 0.0
+    cnt_o3 = 0
+    cnt_o7 = 0
+    cnt_v21 = 0
+
+    for i in range(n):
+        # close, open, low
+        out[i, 0] = c[i]
+        out[i, 1] = o[i]
+        out[i, 2] = l[i]
+
+        # close_ema3, low_ema3 (pandas ewm(adjust=False): seeded with the first value)
+        ema_c, wt_c = _ema3_step(ema_c, wt_c, c[i])
+        ema_l, wt_l = _ema3_step(ema_l, wt_l, l[i])
+        out[i, 3] = ema_c
+        out[i, 4] = ema_l
+
+        # open_sma3, open_sma7 (rolling(min_periods=1).mean())
+        if not np.isnan(o[i]):
+            sum_o3 += o[i]
+            sum_o7 += o[i]
+            cnt_o3 += 1
+            cnt_o7 += 1
+        if i >= 3 and not np.isnan(o[i - 3]):
+            sum_o3 -= o[i - 3]
+            cnt_o3 -= 1
+        if i >= 7 and not np.isnan(o[i - 7]):
+            sum_o7 -= o[i - 7]
+            cnt_o7 -= 1
+        out[i, 5] = sum_o3 / cnt_o3 if cnt_o3 > 0 else nan
+        out[i, 6] = sum_o7 / cnt_o7 if cnt_o7 > 0 else nan
+
+        # high_lag1/2, low_lag1/2, close_lag3
+        out[i, 7] = h[i - 1] if i >= 1 else nan
+        out[i, 8] = h[i - 2] if i >= 2 else nan
+        out[i, 9] = l[i - 1] if i >= 1 else nan
+        out[i, 10] = l[i - 2] if i >= 2 else nan
+        out[i, 11] = c[i - 3] if i >= 3 else nan
+
+        # volume, volume_sma21
+        out[i, 12] = v[i]
+        if not np.isnan(v[i]):
+            sum_v21 += v[i]
+            cnt_v21 += 1
+        if i >= 21 and not np.isnan(v[i - 21]):
+            sum_v21 -= v[i - 21]
+            cnt_v21 -= 1
+        out[i, 13] = sum_v21 / cnt_v21 if cnt_v21 > 0 else nan
+
+
+@njit(cache=True)
+def _tail_mean(x, n, k):
+    """rolling(k, min_periods=1).mean() at row n - 1: NaNs skipped, NaN if none left."""
+    total = 0.0
+    cnt = 0
+    for i in range(max(0, n - k), n):
+        if not np.isnan(x[i]):
+            total += x[i]
+            cnt += 1
+    return total / cnt if cnt > 0 else np.nan
+
+
+@njit(types.void(_F8_IN, _F8_IN, _F8_IN, _F8_IN, _F8_IN, types.float64, types.float64[:]), cache=True)
+def _last_row(o, h, l, c, v, month, out):  # noqa: E741
+    """Only the newest row of _build: EMAs still need the full history, the
+    SMAs and lags are read off the tail. Constant memory, no (N, 15) matrix."""
+    n = c.shape[0]
+    nan = np.nan
+    if n == 0:
+        out[:] = nan
+        return
+
+    ema_c = nan
+    ema_l = nan
+    wt_c = 1.0
+    wt_l = 1.0
+    for i in range(n):
+        ema_c, wt_c = _ema3_step(ema_c, wt_c, c[i])
+        ema_l, wt_l = _ema3_step(ema_l, wt_l, l[i])
+
+    out[0] = c[n - 1]
+    out[1] = o[n - 1]
+    out[2] = l[n - 1]
+    out[3] = ema_c
+    out[4] = ema_l
+    out[5] = _tail_mean(o, n, 3)
+    out[6] = _tail_mean(o, n, 7)
+    out[7] = h[n - 2] if n >= 2 else nan
+    out[8] = h[n - 3] if n >= 3 else nan
+    out[9] = l[n - 2] if n >= 2 else nan
+    out[10] = l[n - 3] if n >= 3 else nan
+    out[11] = c[n - 4] if n >= 4 else nan
+    out[12] = v[n - 1]
+    out[13] = _tail_mean(v, n, 21)
+    out[14] = month
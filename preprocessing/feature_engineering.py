@@ -4,6 +4,15 @@ from typing import Optional, List
 import numpy as np
 import pandas as pd
 
+from scipy.signal import lfilter
+
+try:  # fused native kernels; fall back to the numpy implementation below
+    from preprocessing._numba_features import _build as _build_native
+    from preprocessing._numba_features import _last_row as _last_row_native
+except ImportError:
+    _build_native = None
+    _last_row_native = None
+
 # The exact feature order expected by the model
 FINAL_FEATURES: List[str] = [
     "close", "open", "low",
@@ -20,10 +29,38 @@ __all__ = [
     "FINAL_FEATURES",
     "ensure_time_and_sort",
     "build_features_from_ohlcv",
+    "build_feature_matrix",
+    "build_feature_matrix_from_arrays",
+    "months_from_epoch",
+    "last_feature_row",
+    "to_utc_datetime",
+]
+
+# Columns computed here (the rest of FINAL_FEATURES are raw inputs / month)
+_DERIVED_FEATURES: List[str] = [
+    "close_ema3", "low_ema3",
+    "open_sma3", "open_sma7",
+    "high_lag1", "high_lag2",
+    "low_lag1", "low_lag2",
+    "close_lag3",
+    "volume_sma21",
 ]
+# Positions of those columns in the FINAL_FEATURES matrix, resolved once at import
+_DERIVED_IDX: List[int] = [FINAL_FEATURES.index(name) for name in _DERIVED_FEATURES]
 
 # ----------------------- utils -----------------------
 
+def to_utc_datetime(values):
+    """Parse timestamps as UTC (naive ones are taken as UTC).
+    ISO8601 ("...T00:00:00Z") takes pandas' fast parser; any other layout pandas
+    understands (e.g. "09/30/2025") falls back to format inference.
+    """
+    try:
+        return pd.to_datetime(values, format="ISO8601", utc=True, cache=True)
+    except (TypeError, ValueError):
+        return pd.to_datetime(values, utc=True, cache=True)
+
+
 def ensure_time_and_sort(
     df: pd.DataFrame,
     time_col: str = "timeOpen",
@@ -38,7 +75,7 @@ def ensure_time_and_sort(
             df[time_col] = df[fallback_time_col]
         else:
             raise ValueError("No time column found. Provide 'timeOpen' or 'time'.")
-    df[time_col] = pd.to_datetime(df[time_col])
+    df[time_col] = to_utc_datetime(df[time_col])
     if group_by and group_by in df.columns:
         df = df.sort_values([group_by, time_col]).reset_index(drop=True)
     else:
@@ -47,43 +84,179 @@ def ensure_time_and_sort(
     return df
 
 
-def _ema(series: pd.Series, span: int) -> pd.Series:
-    return series.ewm(span=span, adjust=False).mean()
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Same as Series.ewm(span, adjust=False).mean(): a single-pole IIR filter seeded with x[0].
+    Series with NaNs take the slower exact recurrence (_ema_nan).
+    """
+    if x.size == 0:
+        return x.copy()
+    alpha = 2.0 / (span + 1)
+    if np.isnan(x).any():
+        return _ema_nan(x, span)
+    y, _ = lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * x[0]])
+    return y
 
 
-def _sma(series: pd.Series, window: int) -> pd.Series:
-    return series.rolling(window, min_periods=1).mean()
+def _ema_nan(x: np.ndarray, span: int) -> np.ndarray:
+    """ewm(span, adjust=False).mean() with pandas' NaN handling (ignore_na=False).
+    A NaN repeats the previous mean and decays its weight; leading NaNs stay NaN.
+    pandas weights the next value by 1 - old_wt when com == 1 (span 3), else alpha.
+    """
+    alpha = 2.0 / (span + 1)
+    y = np.empty(x.shape[0], dtype=np.float64)
+    mean = np.nan
+    old_wt = 1.0
+    for i, xi in enumerate(x.tolist()):
+        if mean == mean:
+            old_wt *= 1.0 - alpha
+            if xi == xi:
+                new_wt = 1.0 - old_wt if span == 3 else alpha
+                mean = (old_wt * mean + new_wt * xi) / (old_wt + new_wt)
+                old_wt = 1.0
+        elif xi == xi:
+            mean = xi
+        y[i] = mean
+    return y
 
 
-# ------------------ main feature builder ------------------
+def _sma(x: np.ndarray, window: int) -> np.ndarray:
+    """Same as Series.rolling(window, min_periods=1).mean() (NaNs skipped), via cumulative sums."""
+    valid = ~np.isnan(x)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    ccnt = np.concatenate(([0], np.cumsum(valid)))
+    hi = np.arange(1, x.size + 1)
+    lo = np.maximum(hi - window, 0)
+    cnt = ccnt[hi] - ccnt[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(cnt > 0, (csum[hi] - csum[lo]) / cnt, np.nan)
 
-def build_features_from_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute the features expected by the trained model.
-    Expects columns: open, high, low, close, (optional) volume, and timeOpen/time.
-    """
+
+def _lag(x: np.ndarray, k: int) -> np.ndarray:
+    out = np.full(x.shape[0], np.nan)
+    if k < x.shape[0]:
+        out[k:] = x[:-k]
+    return out
+
+
+def _build_numpy(o, h, l, c, v, out) -> None:  # noqa: E741
+    """Vectorised numpy fallback with the same contract as the native kernel."""
+    out[:, 0] = c
+    out[:, 1] = o
+    out[:, 2] = l
+    out[:, 3] = _ema(c, 3)
+    out[:, 4] = _ema(l, 3)
+    out[:, 5] = _sma(o, 3)
+    out[:, 6] = _sma(o, 7)
+    out[:, 7] = _lag(h, 1)
+    out[:, 8] = _lag(h, 2)
+    out[:, 9] = _lag(l, 1)
+    out[:, 10] = _lag(l, 2)
+    out[:, 11] = _lag(c, 3)
+    out[:, 12] = v
+    out[:, 13] = _sma(v, 21)
+
+
+def _check_ohlc(df: pd.DataFrame) -> None:
     if not {"open", "high", "low", "close"}.issubset(df.columns):
         missing = {"open", "high", "low", "close"} - set(df.columns)
         raise ValueError(f"Missing required OHLC columns: {sorted(missing)}")
 
-    df = ensure_time_and_sort(df)
 
-    # EMAs & SMAs
-    df["close_ema3"] = _ema(df["close"], 3)
-    df["low_ema3"] = _ema(df["low"], 3)
-    df["open_sma3"] = _sma(df["open"], 3)
-    df["open_sma7"] = _sma(df["open"], 7)
+def _feature_matrix(df: pd.DataFrame) -> np.ndarray:
+    """FINAL_FEATURES matrix for an already sorted frame with a 'month' column."""
+    cols = ["open", "high", "low", "close"]
+    if "volume" in df.columns:
+        cols.append("volume")
+    # One conversion, transposed so each series is a contiguous row
+    arr = np.array(df[cols].to_numpy(dtype=np.float64).T, order="C")
+    o, h, l, c = arr[0], arr[1], arr[2], arr[3]  # noqa: E741
+    v = arr[4] if len(cols) == 5 else None
+    return build_feature_matrix_from_arrays(o, h, l, c, v, df["month"].to_numpy(dtype=np.float64))
+
+
+def months_from_epoch(ts: np.ndarray) -> np.ndarray:
+    """Calendar month (1-12, UTC) for unix-second timestamps."""
+    months = np.asarray(ts, dtype=np.int64).astype("datetime64[s]").astype("datetime64[M]")
+    return (months.astype(np.int64) % 12 + 1).astype(np.float64)
+
 
+# ------------------ main feature builder ------------------
+
+def build_feature_matrix_from_arrays(
+    o: np.ndarray,
+    h: np.ndarray,
+    l: np.ndarray,  # noqa: E741
+    c: np.ndarray,
+    v: Optional[np.ndarray],
+    month: np.ndarray,
+) -> np.ndarray:
+    """Compute FINAL_FEATURES from float64 OHLCV arrays already in ascending time order.
+    Same output as build_feature_matrix, without going through a DataFrame.
+    """
+    # Same accepted inputs with or without numba (ints, float32, read-only buffers)
+    o, h, l, c = (np.asarray(x, dtype=np.float64) for x in (o, h, l, c))  # noqa: E741
+    n = c.shape[0]
     # Volume SMA21 if present; else NaNs (model will drop rows missing FINAL_FEATURES)
-    if "volume" in df.columns:
-        df["volume_sma21"] = _sma(df["volume"], 21)
-    else:
-        df["volume_sma21"] = np.nan
+    v = np.full(n, np.nan) if v is None else np.asarray(v, dtype=np.float64)
+
+    out = np.empty((n, len(FINAL_FEATURES)), dtype=np.float64)
+    (_build_native or _build_numpy)(o, h, l, c, v, out)
+    out[:, -1] = month
+    return out
+
+
+def _sorted(df: pd.DataFrame, assume_sorted: bool) -> pd.DataFrame:
+    if not assume_sorted:
+        return ensure_time_and_sort(df)
+    if "month" not in df.columns:
+        raise ValueError("assume_sorted=True requires a 'month' column (see ensure_time_and_sort).")
+    return df
 
-    # Lags
-    df["high_lag1"] = df["high"].shift(1)
-    df["high_lag2"] = df["high"].shift(2)
-    df["low_lag1"] = df["low"].shift(1)
-    df["low_lag2"] = df["low"].shift(2)
-    df["close_lag3"] = df["close"].shift(3)
+
+def build_feature_matrix(df: pd.DataFrame, *, assume_sorted: bool = False) -> np.ndarray:
+    """Compute FINAL_FEATURES as an (N, len(FINAL_FEATURES)) float64 array.
+    Rows follow the sorted time order; leading rows contain NaNs for lags.
+    Pass assume_sorted=True if df already went through ensure_time_and_sort.
+    """
+    _check_ohlc(df)
+    df = _sorted(df, assume_sorted)
+    return _feature_matrix(df)
+
+
+def build_features_from_ohlcv(df: pd.DataFrame, *, assume_sorted: bool = False) -> pd.DataFrame:
+    """Compute the features expected by the trained model.
+    Expects columns: open, high, low, close, (optional) volume, and timeOpen/time.
+    Pass assume_sorted=True if df already went through ensure_time_and_sort
+    (skips re-parsing times, re-sorting and re-deriving 'month').
+    """
+    _check_ohlc(df)
+    df = _sorted(df, assume_sorted)
+
+    X = _feature_matrix(df)
+    df[_DERIVED_FEATURES] = X[:, _DERIVED_IDX]
 
     return df
+
+
+def last_feature_row(
+    o: np.ndarray,
+    h: np.ndarray,
+    l: np.ndarray,  # noqa: E741
+    c: np.ndarray,
+    v: Optional[np.ndarray],
+    month_last: float,
+) -> np.ndarray:
+    """FINAL_FEATURES for the newest candle only (arrays in ascending time order).
+    Equals the last row of build_feature_matrix_from_arrays; may contain NaNs.
+    """
+    o, h, l, c = (np.asarray(x, dtype=np.float64) for x in (o, h, l, c))  # noqa: E741
+    v = np.full(c.shape[0], np.nan) if v is None else np.asarray(v, dtype=np.float64)
+    out = np.empty(len(FINAL_FEATURES), dtype=np.float64)
+    if _last_row_native is not None:
+        _last_row_native(o, h, l, c, v, float(month_last), out)
+    else:
+        full = np.empty((c.shape[0], len(FINAL_FEATURES)), dtype=np.float64)
+        _build_numpy(o, h, l, c, v, full)
+        out[:-1] = full[-1, :-1] if c.shape[0] else np.nan
+        out[-1] = month_last
+    return out
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import os
+
+import joblib
+
+# -----------------------------------------------------------------------------
+# Offline step: compile the LightGBM model into a native shared library with
+# treelite + tl2cgen. app.main loads it (TL2CGEN_LIB_PATH) when present and
+# falls back to the joblib model otherwise.
+#
+#   python scripts/compile_model.py [model_path] [lib_path]
+#
+# Inference scores one row at a time, so the library is built with -Ofast and
+# without OpenMP (tl2cgen only adds OpenMP when asked via options).
+# -----------------------------------------------------------------------------
+
+MODEL_PATH = os.getenv("MODEL_PATH", "models/lgbm_final_ma_copy.joblib")
+TL2CGEN_LIB_PATH = os.getenv("TL2CGEN_LIB_PATH", "models/lgbm.so")
+
+
+def compile_model(model_path: str = MODEL_PATH, libpath: str = TL2CGEN_LIB_PATH) -> str:
+    import tl2cgen
+    import treelite
+
+    model = joblib.load(model_path)
+    booster = getattr(model, "booster_", model)
+    tl2cgen.export_lib(
+        treelite.frontend.from_lightgbm(booster),
+        toolchain="gcc",
+        libpath=libpath,
+        params={"parallel_comp": 0},
+        options=["-Ofast"],
+    )
+    return libpath
+
+
+if __name__ == "__main__":
+    import sys
+    model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+    libpath = sys.argv[2] if len(sys.argv) > 2 else TL2CGEN_LIB_PATH
+    print(f"Compiled {model_path} -> {compile_model(model_path, libpath)}")
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+
+import joblib
+
+# -----------------------------------------------------------------------------
+# Offline step: dump the pickled LightGBM model to LightGBM's native text
+# format. app.main loads it (MODEL_TEXT_PATH) with lgb.Booster(model_file=...)
+# when present, which is faster than unpickling and needs no pickle trust.
+#
+#   python scripts/export_model.py [model_path] [text_path]
+# -----------------------------------------------------------------------------
+
+MODEL_PATH = os.getenv("MODEL_PATH", "models/lgbm_final_ma_copy.joblib")
+MODEL_TEXT_PATH = os.getenv("MODEL_TEXT_PATH", "models/lgbm_final.txt")
+
+
+def export_model(model_path: str = MODEL_PATH, text_path: str = MODEL_TEXT_PATH) -> str:
+    model = joblib.load(model_path)
+    booster = getattr(model, "booster_", model)
+    booster.save_model(text_path)  # keeps best_iteration trees, like model.predict
+    return text_path
+
+
+if __name__ == "__main__":
+    import sys
+    model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+    text_path = sys.argv[2] if len(sys.argv) > 2 else MODEL_TEXT_PATH
+    print(f"Exported {model_path} -> {export_model(model_path, text_path)}")
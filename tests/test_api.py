@@ -0,0 +1,228 @@
+# tests/test_api.py
+import importlib
+import json
+import os
+import sys
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from preprocessing.feature_engineering import FINAL_FEATURES
+
+lgb = pytest.importorskip("lightgbm")
+
+
+def _train_model(path) -> None:
+    # models/*.joblib is an LFS pointer in the repo: serve a tiny model trained here
+    rng = np.random.default_rng(0)
+    X = rng.uniform(100, 200, size=(300, len(FINAL_FEATURES)))
+    y = X[:, FINAL_FEATURES.index("close")] + rng.normal(0, 1, 300)
+    joblib.dump(lgb.LGBMRegressor(n_estimators=20, verbose=-1).fit(X, y), path)
+
+
+def _import_main(path):
+    env = {
+        "MODEL_PATH": str(path),
+        "MODEL_TEXT_PATH": str(path.with_suffix(".txt")),
+        "TL2CGEN_LIB_PATH": str(path.with_suffix(".so")),
+        "MODEL_TARGET_MODE": "level",
+    }
+    sys.modules.pop("app.main", None)
+    try:
+        with patch.dict(os.environ, env):
+            return importlib.import_module("app.main")
+    finally:
+        sys.modules.pop("app.main", None)
+
+
+@pytest.fixture(scope="module")
+def main(tmp_path_factory):
+    path = tmp_path_factory.mktemp("models") / "model.joblib"
+    _train_model(path)
+    return _import_main(path)
+
+
+@pytest.fixture
+def client(main):
+    main._cached_predict.cache_clear()
+    with TestClient(main.app) as c:
+        yield c
+
+
+def _body(n: int = 40) -> dict:
+    times = pd.date_range("2025-08-01", periods=n, freq="D").strftime("%Y-%m-%dT%H:%M:%SZ")
+    close = 150 + np.sin(np.arange(n))
+    return {
+        "candles": [
+            {"timeOpen": t, "open": c - 0.5, "high": c + 2, "low": c - 2, "close": c, "volume": 1e5 + i}
+            for i, (t, c) in enumerate(zip(times, close.tolist()))
+        ]
+    }
+
+
+def test_predict_uses_newest_candle(client):
+    body = _body()
+    r = client.post("/predict", json=body)
+
+    assert r.status_code == 200
+    out = r.json()
+    assert out["last_known_high"] == body["candles"][-1]["high"]
+    assert out["feature_vector_tail"]["close"] == body["candles"][-1]["close"]
+
+
+@pytest.mark.parametrize("content, content_type", [
+    (b"", "application/json"),
+    (b"null", "application/json"),
+    (b"{", "application/json"),
+    (b'{"candles": [}', "application/json"),
+    (b'{"candles": 1}', "application/json"),
+    (b'{"candles": [{"timeOpen": "x", "open": 1}]}', "application/json; charset=utf-8"),
+    (b"[1]", "application/vnd.api+json"),
+    (b"{}", "text/plain"),
+    (b"\xff\xfe\xfa", "application/json"),
+])
+def test_predict_body_errors_match_fastapi(main, client, content, content_type):
+    # POST /predict parses its own body: errors must match a plain FastAPI body parameter
+    ref = FastAPI()
+
+    @ref.post("/predict")
+    def reference(req: main.PredictRequest):
+        return {}
+
+    headers = {"content-type": content_type}
+    expected = TestClient(ref).post("/predict", content=content, headers=headers)
+    r = client.post("/predict", content=content, headers=headers)
+
+    assert r.status_code == expected.status_code
+    assert r.json() == expected.json()
+
+
+def test_predict_accepts_nan_literals_and_missing_content_type(client):
+    body = _body()
+    ok = client.post("/predict", json=body).json()
+    body["candles"][0]["volume"] = float("nan")  # stdlib json writes a bare NaN literal
+
+    r = client.post("/predict", content=json.dumps(body).encode())
+
+    assert r.status_code == 200
+    assert r.json() == ok  # row 0 is outside every window of the newest row
+
+
+@pytest.mark.parametrize("value", ["NaN", "inf", "-Infinity"])
+def test_predict_rejects_non_finite_prices(client, value):
+    body = _body()
+    body["candles"][10]["close"] = value
+
+    r = client.post("/predict", json=body)
+
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"] == ["body", "candles", 10, "close"]
+
+
+def test_predict_falls_back_to_previous_candle_only(client):
+    body = _body()
+    body["candles"][-1]["volume"] = None
+
+    r = client.post("/predict", json=body)
+    assert r.status_code == 200
+    assert r.json()["feature_vector_tail"]["close"] == body["candles"][-2]["close"]
+
+    body["candles"][-2]["volume"] = None
+    r = client.post("/predict", json=body)
+    assert r.status_code == 400
+    assert "two newest candles" in r.json()["detail"]
+
+
+def test_predict_accepts_non_iso_timestamps(client):
+    body = _body()
+    iso = client.post("/predict", json=body).json()
+    for c in body["candles"]:
+        c["timeOpen"] = pd.Timestamp(c["timeOpen"]).strftime("%m/%d/%Y")
+
+    r = client.post("/predict", json=body)
+
+    assert r.status_code == 200
+    assert r.json() == iso
+
+
+def test_predict_rejects_unparseable_timestamps(client):
+    body = _body()
+    body["candles"][3]["timeOpen"] = "not a date"
+
+    r = client.post("/predict", json=body)
+
+    assert r.status_code == 400
+    assert r.json()["detail"].startswith("Invalid timeOpen")
+
+
+def test_shutdown_closes_fetcher_client_and_restart_reopens_it(main):
+    import fetch.kraken_ohlc_solusd as kraken
+
+    for _ in range(2):
+        with TestClient(main.app):
+            aclient = kraken._aclient()
+            assert not aclient.is_closed
+        assert aclient.is_closed
+
+
+def _fetched_candles(n: int = 60) -> dict:
+    ts = 1754006400 + 86400 * np.arange(n, dtype=np.int64)  # 2025-08-01T00:00:00Z, daily
+    close = 150 + np.sin(np.arange(n))
+    return {
+        "timeOpen": ts, "open": close - 0.5, "high": close + 2, "low": close - 2,
+        "close": close, "volume": 1e5 + np.arange(n, dtype=np.float64),
+    }
+
+
+@pytest.fixture
+def fetched(main):
+    candles = _fetched_candles()
+
+    async def fake_fetch(token, n, interval=1440):
+        return {k: v[-n:] for k, v in candles.items()}
+
+    with patch.object(main, "fetch_candles_async", side_effect=fake_fetch):
+        yield candles
+
+
+@pytest.mark.parametrize("date, rows", [
+    ("2025-08-30", 30),  # midnight anchor includes that day's candle
+    ("2025-08-30T12:00:00Z", 30),
+    ("2025-08-30T09:00:00+10:00", 29),  # 2025-08-29T23:00Z
+    ("2030-01-01", 60),
+])
+def test_predict_sol_at_cuts_history_at_anchor(client, fetched, date, rows):
+    r = client.get("/predict/sol/at", params={"date": date, "n": 60})
+
+    assert r.status_code == 200
+    out = r.json()
+    assert out["history_rows_used"] == rows
+    assert out["last_known_high"] == fetched["high"][rows - 1]
+
+
+@pytest.mark.parametrize("date, status", [("", 400), ("NaT", 400), ("soon", 400), ("2025-07-01", 404)])
+def test_predict_sol_at_rejects_bad_anchors(client, fetched, date, status):
+    assert client.get("/predict/sol/at", params={"date": date, "n": 60}).status_code == status
+
+
+def test_text_model_is_used_only_when_not_older_than_joblib(tmp_path):
+    from scripts.export_model import export_model
+
+    path = tmp_path / "model.joblib"
+    _train_model(path)
+    text = export_model(str(path), str(path.with_suffix(".txt")))
+
+    main = _import_main(path)
+    assert main.MODEL_SOURCE == text
+    assert main.model_info()["model_repr"].startswith("lightgbm.Booster(num_trees=20,")
+
+    os.utime(text, (0, 0))  # the joblib was retrained after the export
+    with pytest.warns(UserWarning, match="older than"):
+        main = _import_main(path)
+    assert main.MODEL_SOURCE == str(path)
+    assert main.model_info()["model_repr"].startswith("LGBMRegressor(")
@@ -0,0 +1,144 @@
+# tests/test_feature_engineering.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import preprocessing.feature_engineering as fe
+from preprocessing.feature_engineering import FINAL_FEATURES, build_feature_matrix
+
+
+def _candles(n: int = 64, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 150 + rng.normal(0, 3, n).cumsum()
+    df = pd.DataFrame({
+        "timeOpen": pd.date_range("2025-08-01", periods=n, freq="D").strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "open": close + rng.normal(0, 1, n),
+        "high": close + 3,
+        "low": close - 3,
+        "close": close,
+        "volume": rng.uniform(1e5, 5e5, n),
+    })
+    df.loc[[5, n // 2], "volume"] = np.nan
+    return df.iloc[::-1].reset_index(drop=True)  # unsorted on purpose
+
+
+def _reference(df: pd.DataFrame) -> pd.DataFrame:
+    # The original pandas pipeline the model was trained with
+    df = df.copy()
+    df["timeOpen"] = pd.to_datetime(df["timeOpen"], utc=True)
+    df = df.sort_values("timeOpen").reset_index(drop=True)
+    df["month"] = df["timeOpen"].dt.month
+    df["close_ema3"] = df["close"].ewm(span=3, adjust=False).mean()
+    df["low_ema3"] = df["low"].ewm(span=3, adjust=False).mean()
+    df["open_sma3"] = df["open"].rolling(3, min_periods=1).mean()
+    df["open_sma7"] = df["open"].rolling(7, min_periods=1).mean()
+    df["volume_sma21"] = df["volume"].rolling(21, min_periods=1).mean()
+    df["high_lag1"] = df["high"].shift(1)
+    df["high_lag2"] = df["high"].shift(2)
+    df["low_lag1"] = df["low"].shift(1)
+    df["low_lag2"] = df["low"].shift(2)
+    df["close_lag3"] = df["close"].shift(3)
+    return df[FINAL_FEATURES].astype(float)
+
+
+@pytest.mark.parametrize("native", [True, False])
+@pytest.mark.parametrize("nan_col", [None, "open", "close", "low"])
+def test_feature_matrix_matches_pandas_reference(native, nan_col, monkeypatch):
+    if native and fe._build_native is None:
+        pytest.skip("numba not installed")
+    if not native:
+        monkeypatch.setattr(fe, "_build_native", None)
+
+    df = _candles()
+    if nan_col is not None:
+        # first row, an isolated gap and a run longer than the SMA windows (df is reversed)
+        df.loc[[63, 40, 20, 19, 18, 17, 16, 15, 14, 13], nan_col] = np.nan
+    X = build_feature_matrix(df.copy())
+
+    assert X.shape == (len(df), len(FINAL_FEATURES))
+    np.testing.assert_allclose(X, _reference(df).to_numpy(), rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("nan_at", [[], [0], [4], [4, 5, 6], [0, 1, 9], [19]])
+@pytest.mark.parametrize("span", [3, 5])
+def test_ema_fallback_matches_pandas_ewm(nan_at, span):
+    x = 150 + np.random.default_rng(1).normal(0, 3, 20).cumsum()
+    x[nan_at] = np.nan
+
+    expected = pd.Series(x).ewm(span=span, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(fe._ema(x, span), expected, rtol=1e-12, equal_nan=True)
+
+
+def test_build_features_from_ohlcv_adds_feature_columns():
+    df = fe.build_features_from_ohlcv(_candles(30))
+    assert set(FINAL_FEATURES).issubset(df.columns)
+    assert df["close_lag3"].isna().sum() == 3
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    a = np.array(a)
+    a.flags.writeable = False
+    return a
+
+
+@pytest.mark.parametrize("native", [True, False])
+@pytest.mark.parametrize("convert", [None, _readonly, lambda a: a.astype(np.float32)])
+def test_build_feature_matrix_from_arrays_matches_frame_path(native, convert, monkeypatch):
+    if native and fe._build_native is None:
+        pytest.skip("numba not installed")
+    if not native:
+        monkeypatch.setattr(fe, "_build_native", None)
+
+    df = _candles()
+    X_frame = build_feature_matrix(df.copy())
+
+    df = df.iloc[::-1].reset_index(drop=True)
+    epoch = pd.Timestamp("1970-01-01", tz="UTC")
+    ts = ((pd.to_datetime(df["timeOpen"], utc=True) - epoch) // pd.Timedelta(seconds=1)).to_numpy()
+    arrays = [df[c].to_numpy() for c in ("open", "high", "low", "close", "volume")]
+    if convert is not None:
+        arrays = [convert(a) for a in arrays]
+    X = fe.build_feature_matrix_from_arrays(*arrays, fe.months_from_epoch(ts))
+
+    if convert is None or convert is _readonly:
+        np.testing.assert_array_equal(X, X_frame)
+    else:
+        np.testing.assert_allclose(X, X_frame, rtol=1e-5)
+
+
+def test_months_from_epoch():
+    ts = np.array([0, 1709251200, 1735689599], dtype=np.int64)  # 1970-01-01, 2024-03-01, 2024-12-31
+    np.testing.assert_array_equal(fe.months_from_epoch(ts), [1.0, 3.0, 12.0])
+
+
+@pytest.mark.parametrize("native", [True, False])
+@pytest.mark.parametrize("n", [1, 3, 21, 64])
+@pytest.mark.parametrize("readonly", [False, True])
+@pytest.mark.parametrize("nan_col", [None, "open", "close"])
+def test_last_feature_row_matches_matrix_tail(native, n, readonly, nan_col, monkeypatch):
+    if native and fe._last_row_native is None:
+        pytest.skip("numba not installed")
+    if not native:
+        monkeypatch.setattr(fe, "_last_row_native", None)
+
+    df = _candles().iloc[::-1].iloc[-n:].copy()
+    if nan_col is not None:
+        df.iloc[[n // 2, max(0, n - 2)], df.columns.get_loc(nan_col)] = np.nan
+    arrays = [df[c].to_numpy() for c in ("open", "high", "low", "close", "volume")]
+    arrays = [_readonly(a) if readonly else np.array(a) for a in arrays]
+    month = np.full(n, 8.0)
+
+    x = fe.last_feature_row(*arrays, month[-1])
+
+    X = fe.build_feature_matrix_from_arrays(*arrays, month)
+    np.testing.assert_allclose(x, X[-1], rtol=1e-12, equal_nan=True)
+
+
+def test_assume_sorted_skips_resort_and_requires_month():
+    df = fe.ensure_time_and_sort(_candles())
+    np.testing.assert_array_equal(
+        build_feature_matrix(df, assume_sorted=True), build_feature_matrix(df.copy())
+    )
+
+    with pytest.raises(ValueError, match="month"):
+        fe.build_features_from_ohlcv(_candles(), assume_sorted=True)
@@ -0,0 +1,127 @@
+# tests/test_kraken_fetch.py
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+import fetch.kraken_ohlc_solusd as kraken
+from fetch.kraken_ohlc_solusd import get_recent_candles
+
+
+def _fake_response(n_rows: int = 30) -> MagicMock:
+    rows = [
+        # [time, open, high, low, close, vwap, volume, count]
+        [1710000000 + i * 86400, "150.1", "151.0", "149.8", "150.6", "150.5", "123.45", 1000]
+        for i in range(n_rows)
+    ]
+    return _response_for({"error": [], "result": {"SOLUSD": rows, "last": rows[-1][0]}})
+
+
+def _response_for(payload: dict) -> MagicMock:
+    resp = MagicMock()
+    resp.content = json.dumps(payload).encode()
+    return resp
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    kraken._CACHE.clear()
+    yield
+    kraken._CACHE.clear()
+
+
+@patch.object(kraken._SESSION, "get")
+def test_get_recent_candles_returns_last_n_ascending(mock_get):
+    mock_get.return_value = _fake_response()
+
+    out = get_recent_candles("SOLUSD", 21)
+
+    assert set(out) == {"timeOpen", "open", "high", "low", "close", "volume"}
+    assert all(len(col) == 21 for col in out.values())
+    assert out["timeOpen"].dtype == np.int64 and out["close"].dtype == np.float64
+    assert np.all(np.diff(out["timeOpen"]) > 0)
+    assert out["timeOpen"][-1] == 1710000000 + 29 * 86400
+    assert (out["open"][-1], out["high"][-1], out["low"][-1], out["close"][-1], out["volume"][-1]) == (
+        150.1, 151.0, 149.8, 150.6, 123.45,
+    )
+
+
+@patch.object(kraken._SESSION, "get")
+def test_get_recent_candles_is_cached_per_pair_and_interval(mock_get):
+    mock_get.return_value = _fake_response()
+
+    get_recent_candles("SOLUSD", 21)
+    assert len(get_recent_candles("SOL", 5)["close"]) == 5
+    assert mock_get.call_count == 1
+
+    get_recent_candles("SOLUSD", 21, interval=60)
+    assert mock_get.call_count == 2
+
+
+@patch.object(kraken._SESSION, "get")
+def test_cached_candles_are_read_only(mock_get):
+    mock_get.return_value = _fake_response()
+
+    out = get_recent_candles("SOLUSD", 21)
+    with pytest.raises(ValueError, match="read-only"):
+        out["close"][-1] = 0.0
+
+    assert get_recent_candles("SOLUSD", 21)["close"][-1] == 150.6
+
+
+@patch.object(kraken._SESSION, "get")
+def test_get_recent_candles_refetches_after_ttl(mock_get):
+    mock_get.return_value = _fake_response()
+
+    with patch.object(kraken.time, "monotonic", return_value=1000.0):
+        get_recent_candles("SOLUSD", 21)
+    with patch.object(kraken.time, "monotonic", return_value=1000.0 + kraken._cache_ttl(1440)):
+        get_recent_candles("SOLUSD", 21)
+
+    assert mock_get.call_count == 2
+
+
+def test_get_recent_candles_async_shares_cache():
+    async def fake_get(*args, **kwargs):
+        return _fake_response()
+
+    with patch.object(kraken._aclient(), "get", side_effect=fake_get) as mock_aget, \
+            patch.object(kraken._SESSION, "get") as mock_get:
+        out = asyncio.run(kraken.get_recent_candles_async("SOLUSD", 21))
+        assert len(out["close"]) == 21
+        np.testing.assert_array_equal(get_recent_candles("SOLUSD", 21)["timeOpen"], out["timeOpen"])
+
+    assert mock_aget.call_count == 1
+    mock_get.assert_not_called()
+
+
+def test_aclose_lets_the_next_call_open_a_new_client():
+    client = kraken._aclient()
+    assert kraken._aclient() is client
+
+    asyncio.run(kraken.aclose())
+
+    assert client.is_closed
+    assert not kraken._aclient().is_closed
+
+
+@patch.object(kraken._SESSION, "get")
+def test_get_recent_candles_reorders_unsorted_rows(mock_get):
+    payload = json.loads(_fake_response(25).content)
+    rows = payload["result"]["SOLUSD"]
+    rows[3], rows[10] = rows[10], rows[3]
+    mock_get.return_value = _response_for(payload)
+
+    out = get_recent_candles("SOLUSD", 25)
+
+    assert np.all(np.diff(out["timeOpen"]) > 0)
+
+
+@patch.object(kraken._SESSION, "get")
+def test_get_recent_candles_raises_on_kraken_error(mock_get):
+    mock_get.return_value = _response_for({"error": ["EQuery:Unknown asset pair"], "result": {}})
+
+    with pytest.raises(RuntimeError, match="Kraken error"):
+        get_recent_candles("SOLUSD", 21)